@@ -1,633 +1,1403 @@
-from typing import Dict, List, Optional, Any
-
-from scipy.signal import find_peaks
-import numpy as np
-import pandas as pd
-
-
-# --------------------------- 通用指标 --------------------------- #
-
-def compute_kdj(df: pd.DataFrame, n: int = 9) -> pd.DataFrame:
-    if df.empty:
-        return df.assign(K=np.nan, D=np.nan, J=np.nan)
-
-    low_n = df["low"].rolling(window=n, min_periods=1).min()
-    high_n = df["high"].rolling(window=n, min_periods=1).max()
-    rsv = (df["close"] - low_n) / (high_n - low_n + 1e-9) * 100
-
-    K = np.zeros_like(rsv, dtype=float)
-    D = np.zeros_like(rsv, dtype=float)
-    for i in range(len(df)):
-        if i == 0:
-            K[i] = D[i] = 50.0
-        else:
-            K[i] = 2 / 3 * K[i - 1] + 1 / 3 * rsv.iloc[i]
-            D[i] = 2 / 3 * D[i - 1] + 1 / 3 * K[i]
-    J = 3 * K - 2 * D
-    return df.assign(K=K, D=D, J=J)
-
-
-def compute_bbi(df: pd.DataFrame) -> pd.Series:
-    ma3 = df["close"].rolling(3).mean()
-    ma6 = df["close"].rolling(6).mean()
-    ma12 = df["close"].rolling(12).mean()
-    ma24 = df["close"].rolling(24).mean()
-    return (ma3 + ma6 + ma12 + ma24) / 4
-
-
-def compute_rsv(
-    df: pd.DataFrame,
-    n: int,
-) -> pd.Series:
-    """
-    按公式：RSV(N) = 100 × (C - LLV(L,N)) ÷ (HHV(C,N) - LLV(L,N))
-    - C 用收盘价最高值 (HHV of close)
-    - L 用最低价最低值 (LLV of low)
-    """
-    low_n = df["low"].rolling(window=n, min_periods=1).min()
-    high_close_n = df["close"].rolling(window=n, min_periods=1).max()
-    rsv = (df["close"] - low_n) / (high_close_n - low_n + 1e-9) * 100.0
-    return rsv
-
-
-def compute_dif(df: pd.DataFrame, fast: int = 12, slow: int = 26) -> pd.Series:
-    """计算 MACD 指标中的 DIF (EMA fast - EMA slow)。"""
-    ema_fast = df["close"].ewm(span=fast, adjust=False).mean()
-    ema_slow = df["close"].ewm(span=slow, adjust=False).mean()
-    return ema_fast - ema_slow
-
-
-def bbi_deriv_uptrend(
-    bbi: pd.Series,
-    *,
-    min_window: int,
-    max_window: int | None = None,
-    q_threshold: float = 0.0,
-) -> bool:
-    """
-    判断 BBI 是否“整体上升”。
-
-    令最新交易日为 T，在区间 [T-w+1, T]（w 自适应，w ≥ min_window 且 ≤ max_window）
-    内，先将 BBI 归一化：BBI_norm(t) = BBI(t) / BBI(T-w+1)。
-
-    再计算一阶差分 Δ(t) = BBI_norm(t) - BBI_norm(t-1)。  
-    若 Δ(t) 的前 q_threshold 分位数 ≥ 0，则认为该窗口通过；只要存在
-    **最长** 满足条件的窗口即可返回 True。q_threshold=0 时退化为
-    “全程单调不降”（旧版行为）。
-
-    Parameters
-    ----------
-    bbi : pd.Series
-        BBI 序列（最新值在最后一位）。
-    min_window : int
-        检测窗口的最小长度。
-    max_window : int | None
-        检测窗口的最大长度；None 表示不设上限。
-    q_threshold : float, default 0.0
-        允许一阶差分为负的比例（0 ≤ q_threshold ≤ 1）。
-    """
-    if not 0.0 <= q_threshold <= 1.0:
-        raise ValueError("q_threshold 必须位于 [0, 1] 区间内")
-
-    bbi = bbi.dropna()
-    if len(bbi) < min_window:
-        return False
-
-    longest = min(len(bbi), max_window or len(bbi))
-
-    # 自最长窗口向下搜索，找到任一满足条件的区间即通过
-    for w in range(longest, min_window - 1, -1):
-        seg = bbi.iloc[-w:]                # 区间 [T-w+1, T]
-        norm = seg / seg.iloc[0]           # 归一化
-        diffs = np.diff(norm.values)       # 一阶差分
-        if np.quantile(diffs, q_threshold) >= 0:
-            return True
-    return False
-
-
-def _find_peaks(
-    df: pd.DataFrame,
-    *,
-    column: str = "high",
-    distance: Optional[int] = None,
-    prominence: Optional[float] = None,
-    height: Optional[float] = None,
-    width: Optional[float] = None,
-    rel_height: float = 0.5,
-    **kwargs: Any,
-) -> pd.DataFrame:
-    
-    if column not in df.columns:
-        raise KeyError(f"'{column}' not found in DataFrame columns: {list(df.columns)}")
-
-    y = df[column].to_numpy()
-
-    indices, props = find_peaks(
-        y,
-        distance=distance,
-        prominence=prominence,
-        height=height,
-        width=width,
-        rel_height=rel_height,
-        **kwargs,
-    )
-
-    peaks_df = df.iloc[indices].copy()
-    peaks_df["is_peak"] = True
-
-    # Flatten SciPy arrays into columns (only those with same length as indices)
-    for key, arr in props.items():
-        if isinstance(arr, (list, np.ndarray)) and len(arr) == len(indices):
-            peaks_df[f"peak_{key}"] = arr
-
-    return peaks_df
-
-
-# --------------------------- Selector 类 --------------------------- #
-class BBIKDJSelector:
-    """
-    自适应 *BBI(导数)* + *KDJ* 选股器
-        • BBI: 允许 bbi_q_threshold 比例的回撤
-        • KDJ: J < threshold ；或位于历史 J 的 j_q_threshold 分位及以下
-        • MACD: DIF > 0
-        • 收盘价波动幅度 ≤ price_range_pct
-    """
-
-    def __init__(
-        self,
-        j_threshold: float = -5,
-        bbi_min_window: int = 90,
-        max_window: int = 90,
-        price_range_pct: float = 100.0,
-        bbi_q_threshold: float = 0.05,
-        j_q_threshold: float = 0.10,
-    ) -> None:
-        self.j_threshold = j_threshold
-        self.bbi_min_window = bbi_min_window
-        self.max_window = max_window
-        self.price_range_pct = price_range_pct
-        self.bbi_q_threshold = bbi_q_threshold  # ← 原 q_threshold
-        self.j_q_threshold = j_q_threshold      # ← 新增
-
-    # ---------- 单支股票过滤 ---------- #
-    def _passes_filters(self, hist: pd.DataFrame) -> bool:
-        hist = hist.copy()
-        hist["BBI"] = compute_bbi(hist)
-
-        # 0. 收盘价波动幅度约束（最近 max_window 根 K 线）
-        win = hist.tail(self.max_window)
-        high, low = win["close"].max(), win["close"].min()
-        if low <= 0 or (high / low - 1) > self.price_range_pct:           
-            return False
-
-        # 1. BBI 上升（允许部分回撤）
-        if not bbi_deriv_uptrend(
-            hist["BBI"],
-            min_window=self.bbi_min_window,
-            max_window=self.max_window,
-            q_threshold=self.bbi_q_threshold,
-        ):            
-            return False
-
-        # 2. KDJ 过滤 —— 双重条件
-        kdj = compute_kdj(hist)
-        j_today = float(kdj.iloc[-1]["J"])
-
-        # 最近 max_window 根 K 线的 J 分位
-        j_window = kdj["J"].tail(self.max_window).dropna()
-        if j_window.empty:
-            return False
-        j_quantile = float(j_window.quantile(self.j_q_threshold))
-
-        if not (j_today < self.j_threshold or j_today <= j_quantile):
-            
-            return False
-
-        # 3. MACD：DIF > 0
-        hist["DIF"] = compute_dif(hist)
-        return hist["DIF"].iloc[-1] > 0
-
-    # ---------- 多股票批量 ---------- #
-    def select(
-        self, date: pd.Timestamp, data: Dict[str, pd.DataFrame]
-    ) -> List[str]:
-        picks: List[str] = []
-        for code, df in data.items():
-            hist = df[df["date"] <= date]
-            if hist.empty:
-                continue
-            # 额外预留 20 根 K 线缓冲
-            hist = hist.tail(self.max_window + 20)
-            if self._passes_filters(hist):
-                picks.append(code)
-        return picks
-    
-    
-class SuperB1Selector:
-    """SuperB1 选股器
-
-    过滤逻辑概览
-    ----------------
-    1. **历史匹配 (t_m)** — 在 *lookback_n* 个交易日窗口内，至少存在一日
-       满足 :class:`BBIKDJSelector`。
-
-    2. **盘整区间** — 区间 ``[t_m, date-1]`` 收盘价波动率不超过 ``close_vol_pct``。
-
-    3. **当日下跌** — ``(close_{date-1} - close_date) / close_{date-1}``
-       ≥ ``price_drop_pct``。
-
-    4. **J 值极低** — ``J < j_threshold`` *或* 位于历史 ``j_q_threshold`` 分位。
-    """
-
-    # ---------------------------------------------------------------------
-    # 构造函数
-    # ---------------------------------------------------------------------
-    def __init__(
-        self,
-        *,
-        lookback_n: int = 60,
-        close_vol_pct: float = 0.05,
-        price_drop_pct: float = 0.03,
-        j_threshold: float = -5,
-        j_q_threshold: float = 0.10,
-        # ↓↓↓ 新增：嵌套 BBIKDJSelector 配置
-        B1_params: Optional[Dict[str, Any]] = None        
-    ) -> None:        
-        # ---------- 参数合法性检查 ----------
-        if lookback_n < 2:
-            raise ValueError("lookback_n 应 ≥ 2")
-        if not (0 < close_vol_pct < 1):
-            raise ValueError("close_vol_pct 应位于 (0, 1) 区间")
-        if not (0 < price_drop_pct < 1):
-            raise ValueError("price_drop_pct 应位于 (0, 1) 区间")
-        if not (0 <= j_q_threshold <= 1):
-            raise ValueError("j_q_threshold 应位于 [0, 1] 区间")
-        if B1_params is None:
-            raise ValueError("bbi_params没有给出")
-
-        # ---------- 基本参数 ----------
-        self.lookback_n = lookback_n
-        self.close_vol_pct = close_vol_pct
-        self.price_drop_pct = price_drop_pct
-        self.j_threshold = j_threshold
-        self.j_q_threshold = j_q_threshold
-
-        # ---------- 内部 BBIKDJSelector ----------
-        self.bbi_selector = BBIKDJSelector(**(B1_params or {}))
-
-        # 为保证给 BBIKDJSelector 提供足够历史，预留额外缓冲
-        self._extra_for_bbi = self.bbi_selector.max_window + 20
-
-    # 单支股票过滤核心
-    def _passes_filters(self, hist: pd.DataFrame) -> bool:
-        """*hist* 必须按日期升序，且最后一行为目标 *date*。"""
-        if len(hist) < 2:
-            return False
-
-        # ---------- Step-0: 数据量判断 ----------
-        if len(hist) < self.lookback_n + self._extra_for_bbi:
-            return False
-
-        # ---------- Step-1: 搜索满足 BBIKDJ 的 t_m ----------
-        lb_hist = hist.tail(self.lookback_n + 1)  # +1 以排除自身
-        tm_idx: int | None = None
-        # 遍历回溯窗口
-        for idx in lb_hist.index[:-1]:            
-            if self.bbi_selector._passes_filters(hist.loc[:idx]):
-                tm_idx = idx
-                stable_seg = hist.loc[tm_idx : hist.index[-2], "close"]
-                if len(stable_seg) < 3:
-                    tm_idx = None
-                    break
-                high, low = stable_seg.max(), stable_seg.min()
-                if low <= 0 or (high / low - 1) > self.close_vol_pct:                                      
-                    tm_idx = None
-                    continue
-                else:
-                    break
-        if tm_idx is None:            
-            return False        
-        
-
-        # ---------- Step-3: 当日相对前一日跌幅 ----------
-        close_today, close_prev = hist["close"].iloc[-1], hist["close"].iloc[-2]
-        if close_prev <= 0 or (close_prev - close_today) / close_prev < self.price_drop_pct:            
-            return False
-
-        # ---------- Step-4: J 值极低 ----------
-        kdj = compute_kdj(hist)
-        j_today = float(kdj["J"].iloc[-1])
-        j_window = kdj["J"].iloc[-self.lookback_n:].dropna()
-        j_q_val = float(j_window.quantile(self.j_q_threshold)) if not j_window.empty else np.nan
-        if not (j_today < self.j_threshold or j_today <= j_q_val):            
-            return False
-
-        return True
-
-    # 批量选股接口
-    def select(self, date: pd.Timestamp, data: Dict[str, pd.DataFrame]) -> List[str]:        
-        picks: List[str] = []
-        min_len = self.lookback_n + self._extra_for_bbi
-
-        for code, df in data.items():
-            hist = df[df["date"] <= date].tail(min_len)
-            if len(hist) < min_len:
-                continue
-            if self._passes_filters(hist):
-                picks.append(code)
-
-        return picks
-
-
-class PeakKDJSelector:
-    """
-    Peaks + KDJ 选股器    
-    """
-
-    def __init__(
-        self,
-        j_threshold: float = -5,
-        max_window: int = 90,
-        fluc_threshold: float = 0.03,
-        gap_threshold: float = 0.02,
-        j_q_threshold: float = 0.10,
-    ) -> None:
-        self.j_threshold = j_threshold
-        self.max_window = max_window
-        self.fluc_threshold = fluc_threshold  # 当日↔peak_(t-n) 波动率上限
-        self.gap_threshold = gap_threshold    # oc_prev 必须高于区间最低收盘价的比例
-        self.j_q_threshold = j_q_threshold
-
-    # ---------- 单支股票过滤 ---------- #
-        # ---------- 单支股票过滤 ---------- #
-    def _passes_filters(self, hist: pd.DataFrame) -> bool:
-        if hist.empty:
-            return False
-
-        hist = hist.copy().sort_values("date")
-        hist["oc_max"] = hist[["open", "close"]].max(axis=1)
-
-        # 1. 提取 peaks
-        peaks_df = _find_peaks(
-            hist,
-            column="oc_max",
-            distance=6,
-            prominence=0.5,
-        )
-        
-        # 至少两个峰      
-        date_today = hist.iloc[-1]["date"]
-        peaks_df = peaks_df[peaks_df["date"] < date_today]
-        if len(peaks_df) < 2:               
-            return False
-
-        peak_t = peaks_df.iloc[-1]          # 最新一个峰
-        peaks_list = peaks_df.reset_index(drop=True)
-        oc_t = peak_t.oc_max
-        total_peaks = len(peaks_list)
-
-        # 2. 回溯寻找 peak_(t-n)
-        target_peak = None        
-        for idx in range(total_peaks - 2, -1, -1):
-            peak_prev = peaks_list.loc[idx]
-            oc_prev = peak_prev.oc_max
-            if oc_t <= oc_prev:             # 要求 peak_t > peak_(t-n)
-                continue
-
-            # 只有当“总峰数 ≥ 3”时才检查区间内其他峰 oc_max
-            if total_peaks >= 3 and idx < total_peaks - 2:
-                inter_oc = peaks_list.loc[idx + 1 : total_peaks - 2, "oc_max"]
-                if not (inter_oc < oc_prev).all():
-                    continue
-
-            # 新增： oc_prev 高于区间最低收盘价 gap_threshold
-            date_prev = peak_prev.date
-            mask = (hist["date"] > date_prev) & (hist["date"] < peak_t.date)
-            min_close = hist.loc[mask, "close"].min()
-            if pd.isna(min_close):
-                continue                    # 区间无数据
-            if oc_prev <= min_close * (1 + self.gap_threshold):
-                continue
-
-            target_peak = peak_prev
-            
-            break
-
-        if target_peak is None:
-            return False
-
-        # 3. 当日收盘价波动率
-        close_today = hist.iloc[-1]["close"]
-        fluc_pct = abs(close_today - target_peak.close) / target_peak.close
-        if fluc_pct > self.fluc_threshold:
-            return False
-
-        # 4. KDJ 过滤
-        kdj = compute_kdj(hist)
-        j_today = float(kdj.iloc[-1]["J"])
-        j_window = kdj["J"].tail(self.max_window).dropna()
-        if j_window.empty:
-            return False
-        j_quantile = float(j_window.quantile(self.j_q_threshold))
-        if not (j_today < self.j_threshold or j_today <= j_quantile):
-            return False
-
-        return True
-
-    # ---------- 多股票批量 ---------- #
-    def select(
-        self,
-        date: pd.Timestamp,
-        data: Dict[str, pd.DataFrame],
-    ) -> List[str]:
-        picks: List[str] = []
-        for code, df in data.items():
-            hist = df[df["date"] <= date]
-            if hist.empty:
-                continue
-            hist = hist.tail(self.max_window + 20)  # 额外缓冲
-            if self._passes_filters(hist):
-                picks.append(code)
-        return picks
-    
-
-class BBIShortLongSelector:
-    """
-    BBI 上升 + 短/长期 RSV 条件 + DIF > 0 选股器
-    """
-    def __init__(
-        self,
-        n_short: int = 3,
-        n_long: int = 21,
-        m: int = 3,
-        bbi_min_window: int = 90,
-        max_window: int = 150,
-        bbi_q_threshold: float = 0.05,
-    ) -> None:
-        if m < 2:
-            raise ValueError("m 必须 ≥ 2")
-        self.n_short = n_short
-        self.n_long = n_long
-        self.m = m
-        self.bbi_min_window = bbi_min_window
-        self.max_window = max_window
-        self.bbi_q_threshold = bbi_q_threshold   # 新增参数
-
-    # ---------- 单支股票过滤 ---------- #
-    def _passes_filters(self, hist: pd.DataFrame) -> bool:
-        hist = hist.copy()
-        hist["BBI"] = compute_bbi(hist)
-
-        # 1. BBI 上升（允许部分回撤）
-        if not bbi_deriv_uptrend(
-            hist["BBI"],
-            min_window=self.bbi_min_window,
-            max_window=self.max_window,
-            q_threshold=self.bbi_q_threshold,
-        ):
-            return False
-
-        # 2. 计算短/长期 RSV -----------------
-        hist["RSV_short"] = compute_rsv(hist, self.n_short)
-        hist["RSV_long"] = compute_rsv(hist, self.n_long)
-
-        if len(hist) < self.m:
-            return False                        # 数据不足
-
-        win = hist.iloc[-self.m :]              # 最近 m 天
-        long_ok = (win["RSV_long"] >= 80).all() # 长期 RSV 全 ≥ 80
-
-        short_series = win["RSV_short"]
-        short_start_end_ok = (
-            short_series.iloc[0] >= 80 and short_series.iloc[-1] >= 80
-        )
-        short_has_below_20 = (short_series < 20).any()
-
-        if not (long_ok and short_start_end_ok and short_has_below_20):
-            return False
-
-        # 3. MACD：DIF > 0 -------------------
-        hist["DIF"] = compute_dif(hist)
-        return hist["DIF"].iloc[-1] > 0
-
-    # ---------- 多股票批量 ---------- #
-    def select(
-        self,
-        date: pd.Timestamp,
-        data: Dict[str, pd.DataFrame],
-    ) -> List[str]:
-        picks: List[str] = []
-        for code, df in data.items():
-            hist = df[df["date"] <= date]
-            if hist.empty:
-                continue
-            # 预留足够长度：RSV 计算窗口 + BBI 检测窗口 + m
-            need_len = (
-                max(self.n_short, self.n_long)
-                + self.bbi_min_window
-                + self.m
-            )
-            hist = hist.tail(max(need_len, self.max_window))
-            if self._passes_filters(hist):
-                picks.append(code)
-        return picks
-
-
-class BreakoutVolumeKDJSelector:
-    """
-    放量突破 + KDJ + DIF>0 + 收盘价波动幅度 选股器   
-    """
-
-    def __init__(
-        self,
-        j_threshold: float = 0.0,
-        up_threshold: float = 3.0,
-        volume_threshold: float = 2.0 / 3,
-        offset: int = 15,
-        max_window: int = 120,
-        price_range_pct: float = 10.0,
-        j_q_threshold: float = 0.10,        # ← 新增
-    ) -> None:
-        self.j_threshold = j_threshold
-        self.up_threshold = up_threshold
-        self.volume_threshold = volume_threshold
-        self.offset = offset
-        self.max_window = max_window
-        self.price_range_pct = price_range_pct
-        self.j_q_threshold = j_q_threshold  # ← 新增
-
-    # ---------- 单支股票过滤 ---------- #
-    def _passes_filters(self, hist: pd.DataFrame) -> bool:
-        if len(hist) < self.offset + 2:
-            return False
-
-        hist = hist.tail(self.max_window).copy()
-
-        # ---- 收盘价波动幅度约束 ----
-        high, low = hist["close"].max(), hist["close"].min()
-        if low <= 0 or (high / low - 1) > self.price_range_pct:
-            return False
-
-        # ---- 技术指标 ----
-        hist = compute_kdj(hist)
-        hist["pct_chg"] = hist["close"].pct_change() * 100
-        hist["DIF"] = compute_dif(hist)
-
-        # 0) 指定日约束：J < j_threshold 或位于历史分位；且 DIF > 0
-        j_today = float(hist["J"].iloc[-1])
-
-        j_window = hist["J"].tail(self.max_window).dropna()
-        if j_window.empty:
-            return False
-        j_quantile = float(j_window.quantile(self.j_q_threshold))
-
-        # 若不满足任一 J 条件，则淘汰
-        if not (j_today < self.j_threshold or j_today <= j_quantile):
-            return False
-        if hist["DIF"].iloc[-1] <= 0:
-            return False
-
-        # ---- 放量突破条件 ----
-        n = len(hist)
-        wnd_start = max(0, n - self.offset - 1)
-        last_idx = n - 1
-
-        for t_idx in range(wnd_start, last_idx):  # 探索突破日 T
-            row = hist.iloc[t_idx]
-
-            # 1) 单日涨幅
-            if row["pct_chg"] < self.up_threshold:
-                continue
-
-            # 2) 相对放量
-            vol_T = row["volume"]
-            if vol_T <= 0:
-                continue
-            vols_except_T = hist["volume"].drop(index=hist.index[t_idx])
-            if not (vols_except_T <= self.volume_threshold * vol_T).all():
-                continue
-
-            # 3) 创新高
-            if row["close"] <= hist["close"].iloc[:t_idx].max():
-                continue
-
-            # 4) T 之后 J 值维持高位
-            if not (hist["J"].iloc[t_idx:last_idx] > hist["J"].iloc[-1] - 10).all():
-                continue
-
-            return True  # 满足所有条件
-
-        return False
-
-    # ---------- 多股票批量 ---------- #
-    def select(
-        self, date: pd.Timestamp, data: Dict[str, pd.DataFrame]
-    ) -> List[str]:
-        picks: List[str] = []
-        for code, df in data.items():
-            hist = df[df["date"] <= date]
-            if hist.empty:
-                continue
-            if self._passes_filters(hist):
-                picks.append(code)
-        return picks
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Any, Union
+
+import numpy as np
+import pandas as pd
+
+# numba 为可选加速依赖：缺失时退化为纯 Python/NumPy 实现，结果一致
+from _njit import njit, prange
+
+
+# --------------------------- 列式行情缓存 --------------------------- #
+
+@dataclass
+class StockArrays:
+    """单支股票行情的列式（SoA）ndarray 视图。
+
+    由 :func:`to_arrays` 在首次访问时从 DataFrame 提取并缓存，
+    多个 Selector 跑同一份 ``data`` 时只做一次列提取。
+    """
+
+    __slots__ = ("date", "open", "high", "low", "close", "volume", "_indicators")
+
+    date: np.ndarray    # datetime64[ns]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return self.close.shape[0]
+
+    def window(self, start: int, end: int) -> "StockArrays":
+        """按整数位置切片，返回零拷贝视图。"""
+        return StockArrays(
+            self.date[start:end],
+            self.open[start:end],
+            self.high[start:end],
+            self.low[start:end],
+            self.close[start:end],
+            self.volume[start:end],
+        )
+
+
+_ARRAYS_KEY = "_stock_arrays"
+
+StockData = Union[pd.DataFrame, StockArrays]
+
+
+def to_arrays(obj: StockData) -> StockArrays:
+    """提取列式 ndarray 视图；DataFrame 上缓存于 ``attrs``，重复调用零开销。"""
+    if isinstance(obj, StockArrays):
+        return obj
+    cached = obj.attrs.get(_ARRAYS_KEY)
+    # attrs 会随切片 /copy()/ 列替换传播：除长度外再校验首末日期与末收盘，
+    # 防止命中父表或旧表的缓存而悄悄返回过期数据
+    if cached is not None and len(cached) == len(obj):
+        if len(obj) == 0:
+            return cached
+        dates = obj["date"].to_numpy(copy=False)
+        if (
+            dates[0] == cached.date[0]
+            and dates[-1] == cached.date[-1]
+            and np.float32(obj["close"].iat[-1]) == cached.close[-1]
+        ):
+            return cached
+    # OHLC 用 float32：行情精度（分）远在 float32 有效位内，
+    # 内存带宽减半、SIMD 通道翻倍；K/D 递推等仍在 float64 中进行
+    arrs = StockArrays(
+        obj["date"].to_numpy(copy=False),
+        obj["open"].to_numpy(dtype=np.float32),
+        obj["high"].to_numpy(dtype=np.float32),
+        obj["low"].to_numpy(dtype=np.float32),
+        obj["close"].to_numpy(dtype=np.float32),
+        obj["volume"].to_numpy(dtype=np.float64, copy=False),
+    )
+    obj.attrs[_ARRAYS_KEY] = arrs
+    return arrs
+
+
+@dataclass
+class IndicatorBundle:
+    """单支股票全历史的因果指标数组（K/D/J、BBI、DIF、按需 RSV）。
+
+    这些指标都只依赖过去：在完整历史上算一次、按窗口切片，
+    即可供所有 Selector 复用，指标计算量与 Selector 数量解耦。
+    窗口起点的 KDJ/EMA 种子差异按 (2/3)^t 衰减，在各窗口预留的
+    缓冲长度下远小于阈值精度。
+    """
+
+    __slots__ = ("K", "D", "J", "bbi", "dif", "_rsv", "_low", "_close")
+
+    K: np.ndarray
+    D: np.ndarray
+    J: np.ndarray
+    bbi: np.ndarray
+    dif: np.ndarray
+    _rsv: Dict[int, np.ndarray]
+    _low: np.ndarray
+    _close: np.ndarray
+
+    def rsv(self, n: int) -> np.ndarray:
+        """RSV(n) 序列；按窗口参数 n 记忆化。"""
+        arr = self._rsv.get(n)
+        if arr is None:
+            low_n = rolling_min_mono(self._low, n)
+            high_close_n = rolling_max_mono(self._close, n)
+            arr = (self._close - low_n) / (high_close_n - low_n + 1e-9) * 100.0
+            arr = arr.astype(np.float32)
+            self._rsv[n] = arr
+        return arr
+
+
+def get_indicators(arrs: StockArrays) -> IndicatorBundle:
+    """取（或懒计算并缓存）该股票的指标组；应传入完整历史的 StockArrays。"""
+    ind = getattr(arrs, "_indicators", None)
+    if ind is None:
+        close = arrs.close
+        low_n = rolling_min_mono(arrs.low, 9)
+        high_n = rolling_max_mono(arrs.high, 9)
+        rsv = (close - low_n) / (high_n - low_n + 1e-9) * 100.0
+        # 递推/EMA 在 float64 中完成，落缓存前降为 float32：
+        # 指标量级 ~1e2，精度绰绰有余，扫描带宽减半
+        K, D = _kdj_recurrence(rsv)
+        K = K.astype(np.float32)
+        D = D.astype(np.float32)
+        dif = ema_adjust_false(close, 12) - ema_adjust_false(close, 26)
+        ind = IndicatorBundle(
+            K,
+            D,
+            np.float32(3.0) * K - np.float32(2.0) * D,
+            _bbi_arr(close).astype(np.float32),
+            dif.astype(np.float32),
+            {},
+            arrs.low,
+            close,
+        )
+        arrs._indicators = ind
+    return ind
+
+
+def _window_kdj_j(arrs: StockArrays, start: int, end: int) -> np.ndarray:
+    """在窗口 [start, end) 内重算的 J 序列（K/D 以窗口首日 50 为种子）。
+
+    放量突破选股器的 J 分位数窗口没有预留缓冲、直达窗口首日，
+    全历史 bundle J 在窗口起点与整窗重算差异尚未衰减，会改变分位数；
+    该选股器因此按窗口重算，其余选股器仍可安全共享 bundle。
+    """
+    low = arrs.low[start:end]
+    close = arrs.close[start:end]
+    low_n = rolling_min_mono(low, 9)
+    high_n = rolling_max_mono(arrs.high[start:end], 9)
+    rsv = (close - low_n) / (high_n - low_n + 1e-9) * 100.0
+    K, D = _kdj_recurrence(rsv)
+    return (3.0 * K - 2.0 * D).astype(np.float32)
+
+
+def clear_indicator_cache(data: Dict[str, "StockData"]) -> None:
+    """丢弃 ``data`` 中缓存的列式数组与指标。
+
+    行情更新（增量写入同一 DataFrame）后调用，强制下次 select 重新提取；
+    平时无需调用 —— 缓存随 DataFrame/StockArrays 对象本身回收。
+    """
+    for obj in data.values():
+        if isinstance(obj, StockArrays):
+            try:
+                del obj._indicators
+            except AttributeError:
+                pass
+        else:
+            obj.attrs.pop(_ARRAYS_KEY, None)
+
+
+@dataclass
+class TickerPanel:
+    """多股票窗口拼接成的列式批量存储（ragged SoA）。
+
+    各股票的窗口依次首尾相接到一维数组上，第 i 支占
+    ``[offsets[i], offsets[i+1])``；批量内核按段扫描，
+    免去逐股票的 Python 调度开销。
+    """
+
+    __slots__ = ("codes", "offsets", "close", "volume", "pct_chg", "J", "dif_last")
+
+    codes: List[str]
+    offsets: np.ndarray   # int64，长度 = 股票数 + 1
+    close: np.ndarray
+    volume: np.ndarray
+    pct_chg: np.ndarray
+    J: np.ndarray
+    dif_last: np.ndarray  # 每支股票截止日的 DIF
+
+
+def build_ticker_panel(
+    data: Dict[str, "StockData"],
+    ts: np.datetime64,
+    max_window: int,
+    min_len: int,
+    max_workers: Optional[int] = None,
+) -> TickerPanel:
+    """把各股票截止 ``ts`` 的最近 ``max_window`` 根窗口拼接成 TickerPanel。
+
+    历史不足 ``min_len`` 根的股票直接剔除；指标取自各自的缓存 bundle，
+    段提取在线程池中并行。
+    """
+    items = list(data.items())
+
+    def _segment(obj: "StockData"):
+        arrs = to_arrays(obj)
+        end = int(np.searchsorted(arrs.date, ts, side="right"))
+        if end < min_len:
+            return None
+        start = max(0, end - max_window)
+        ind = get_indicators(arrs)
+        close = arrs.close[start:end]
+        pct = np.empty(end - start, dtype=np.float64)
+        pct[0] = np.nan
+        pct[1:] = (close[1:] / close[:-1] - 1.0) * 100.0
+        return (
+            close,
+            arrs.volume[start:end],
+            pct,
+            # J 分位数窗口无缓冲，须按窗口重算（见 _window_kdj_j）
+            _window_kdj_j(arrs, start, end),
+            float(ind.dif[end - 1]),
+        )
+
+    if len(items) <= 1:
+        segs = [_segment(obj) for _, obj in items]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+            segs = list(ex.map(lambda kv: _segment(kv[1]), items))
+
+    codes = [code for (code, _), seg in zip(items, segs) if seg is not None]
+    segs = [seg for seg in segs if seg is not None]
+
+    offsets = np.zeros(len(segs) + 1, dtype=np.int64)
+    for i, seg in enumerate(segs):
+        offsets[i + 1] = offsets[i] + seg[0].shape[0]
+    if not segs:
+        empty64 = np.empty(0, dtype=np.float64)
+        return TickerPanel(
+            codes, offsets, np.empty(0, dtype=np.float32),
+            empty64, empty64, empty64, empty64,
+        )
+    return TickerPanel(
+        codes,
+        offsets,
+        np.concatenate([seg[0] for seg in segs]),
+        np.concatenate([seg[1] for seg in segs]),
+        np.concatenate([seg[2] for seg in segs]),
+        np.concatenate([seg[3] for seg in segs]),
+        np.array([seg[4] for seg in segs], dtype=np.float64),
+    )
+
+
+def _select_parallel(
+    data: Dict[str, "StockData"],
+    predicate: Callable[["StockData"], bool],
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """并行评估每支股票的过滤条件，按输入顺序返回通过的代码。
+
+    每支股票相互独立；numpy/numba 内核在计算期间释放 GIL，
+    线程池即可跨核扩展，无需进程间序列化行情数据。
+    """
+    items = list(data.items())
+    if len(items) <= 1:
+        return [code for code, obj in items if predicate(obj)]
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+        flags = list(ex.map(lambda kv: predicate(kv[1]), items))
+    return [code for (code, _), ok in zip(items, flags) if ok]
+
+
+# --------------------------- 通用指标 --------------------------- #
+
+@njit(cache=True)
+def _kdj_recurrence(rsv: np.ndarray):
+    """K/D 递推：K(t)=2/3·K(t-1)+1/3·RSV(t)，D 同理（首日取 50）。"""
+    n = rsv.shape[0]
+    K = np.empty(n, dtype=np.float64)
+    D = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return K, D
+    K[0] = 50.0
+    D[0] = 50.0
+    for i in range(1, n):
+        K[i] = (2.0 / 3.0) * K[i - 1] + (1.0 / 3.0) * rsv[i]
+        D[i] = (2.0 / 3.0) * D[i - 1] + (1.0 / 3.0) * K[i]
+    return K, D
+
+
+@njit(cache=True)
+def rolling_min_mono(a: np.ndarray, n: int) -> np.ndarray:
+    """滚动最小值（min_periods=1 语义），单调队列实现，O(n)。"""
+    size = a.shape[0]
+    out = np.empty(size, dtype=np.float64)
+    deque = np.empty(size, dtype=np.int64)  # 候选下标环形缓冲
+    head = 0
+    tail = 0  # [head, tail) 为有效区间
+    for i in range(size):
+        while tail > head and a[deque[tail - 1]] >= a[i]:
+            tail -= 1
+        deque[tail] = i
+        tail += 1
+        if deque[head] <= i - n:
+            head += 1
+        out[i] = a[deque[head]]
+    return out
+
+
+@njit(cache=True)
+def rolling_max_mono(a: np.ndarray, n: int) -> np.ndarray:
+    """滚动最大值（min_periods=1 语义），单调队列实现，O(n)。"""
+    size = a.shape[0]
+    out = np.empty(size, dtype=np.float64)
+    deque = np.empty(size, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(size):
+        while tail > head and a[deque[tail - 1]] <= a[i]:
+            tail -= 1
+        deque[tail] = i
+        tail += 1
+        if deque[head] <= i - n:
+            head += 1
+        out[i] = a[deque[head]]
+    return out
+
+
+@njit(cache=True)
+def ema_adjust_false(x: np.ndarray, span: int) -> np.ndarray:
+    """等价于 Series.ewm(span=span, adjust=False).mean() 的标量递推。"""
+    n = x.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    out[0] = x[0]
+    for i in range(1, n):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+@njit(cache=True)
+def _running_mean(x: np.ndarray, w: int) -> np.ndarray:
+    """滑动均值（等价 Series.rolling(w).mean()），运行和实现，O(n)。"""
+    n = x.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    s = 0.0
+    for i in range(n):
+        s += x[i]
+        if i >= w:
+            s -= x[i - w]
+        if i >= w - 1:
+            out[i] = s / w
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True)
+def _quantile(a: np.ndarray, q: float) -> float:
+    """q 分位数（线性插值，与 np.quantile 默认行为一致）。
+
+    用 np.partition 取第 k 个次序统计量（O(n)），避免整段排序；
+    第 k+1 个次序统计量即 partition 后右侧的最小值。
+    """
+    m = a.shape[0]
+    pos = q * (m - 1)
+    k = int(pos)
+    frac = pos - k
+    part = np.partition(a, k)
+    val = part[k]
+    if frac > 0.0 and k + 1 < m:
+        nxt = part[k + 1]
+        for i in range(k + 2, m):
+            if part[i] < nxt:
+                nxt = part[i]
+        val = val + frac * (nxt - val)
+    return val
+
+
+@njit(cache=True)
+def _bbi_arr(close: np.ndarray) -> np.ndarray:
+    """BBI = (MA3+MA6+MA12+MA24)/4，滑动求和单趟计算；前 23 日为 NaN。"""
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    s3 = s6 = s12 = s24 = 0.0
+    for i in range(n):
+        c = close[i]
+        s3 += c
+        s6 += c
+        s12 += c
+        s24 += c
+        if i >= 3:
+            s3 -= close[i - 3]
+        if i >= 6:
+            s6 -= close[i - 6]
+        if i >= 12:
+            s12 -= close[i - 12]
+        if i >= 24:
+            s24 -= close[i - 24]
+        if i >= 23:
+            out[i] = (s3 / 3.0 + s6 / 6.0 + s12 / 12.0 + s24 / 24.0) / 4.0
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True)
+def _bbi_uptrend_arr(
+    bbi: np.ndarray,
+    min_window: int,
+    max_window: int,
+    q_threshold: float,
+) -> bool:
+    """bbi_deriv_uptrend 的 ndarray 内核；max_window<=0 表示不设上限。
+
+    归一化基准 seg[0] 恒为正，只是给一阶差分乘上同一正常数，
+    不改变分位数的符号 —— 因此差分只需在原序列上算一次。
+    """
+    n = bbi.shape[0]
+    vals = np.empty(n, dtype=np.float64)
+    cnt = 0
+    for i in range(n):  # 丢弃 NaN（BBI 预热期）
+        if not np.isnan(bbi[i]):
+            vals[cnt] = bbi[i]
+            cnt += 1
+    if cnt < min_window:
+        return False
+
+    longest = cnt if (max_window <= 0 or max_window > cnt) else max_window
+    if longest < min_window:  # max_window < min_window 时不存在可行窗口
+        return False
+
+    d = np.empty(cnt - 1, dtype=np.float64)
+    for i in range(cnt - 1):
+        d[i] = vals[i + 1] - vals[i]
+
+    if q_threshold == 0.0:
+        # 退化为“全程单调不降”：窗口 w 通过 ⟺ 末尾连续非负差分 ≥ w-1
+        run = 0
+        for i in range(cnt - 2, -1, -1):
+            if d[i] >= 0:
+                run += 1
+            else:
+                break
+        return run >= min_window - 1
+
+    # 自最长窗口向下搜索；每个窗口用 partition 取邻近两个次序统计量做线性插值
+    for w in range(longest, min_window - 1, -1):
+        m = w - 1
+        if m < 1:
+            continue
+        pos = q_threshold * (m - 1)
+        k = int(pos)
+        frac = pos - k
+        part = np.partition(d[cnt - 1 - m : cnt - 1], k)
+        val = part[k]
+        if frac > 0.0 and k + 1 < m:
+            nxt = part[k + 1]
+            for i in range(k + 2, m):
+                if part[i] < nxt:
+                    nxt = part[i]
+            val = val + frac * (nxt - val)
+        if val >= 0:
+            return True
+    return False
+
+
+@njit(cache=True)
+def evaluate_bbikdj(
+    close: np.ndarray,
+    J: np.ndarray,
+    dif: np.ndarray,
+    bbi: np.ndarray,
+    start: int,
+    end: int,
+    bbi_min_window: int,
+    max_window: int,
+    bbi_q_threshold: float,
+    j_threshold: float,
+    j_q_threshold: float,
+    price_range_pct: float,
+) -> bool:
+    """BBIKDJSelector 在窗口 [start, end) 上的判定，读取预计算指标切片。
+
+    各条件按「代价 × 淘汰率」升序排列：波动幅度与 DIF 末值 O(1)~O(w)、
+    KDJ 分位其次、最贵的 BBI 上升搜索放最后，被淘汰的股票走不到它。
+    """
+    n = end - start
+    if n <= 0:
+        return False
+    w0 = max_window if max_window < n else n
+
+    # 0. 收盘价波动幅度约束（最近 max_window 根 K 线）
+    hi = close[end - w0]
+    lo = close[end - w0]
+    for i in range(end - w0 + 1, end):
+        if close[i] > hi:
+            hi = close[i]
+        if close[i] < lo:
+            lo = close[i]
+    if lo <= 0 or (hi / lo - 1.0) > price_range_pct:
+        return False
+
+    # 1. MACD：DIF > 0
+    if dif[end - 1] <= 0:
+        return False
+
+    # 2. KDJ 过滤 —— 双重条件（分位数仅在阈值条件未命中时才计算）
+    j_today = J[end - 1]
+    if j_today >= j_threshold:
+        if j_today > _quantile(J[end - w0 : end], j_q_threshold):
+            return False
+
+    # 3. BBI 上升（窗口内前 23 根为 BBI 预热期，与窗口内重算语义一致）
+    ws = start + 23
+    if ws > end:
+        ws = end
+    return _bbi_uptrend_arr(bbi[ws:end], bbi_min_window, max_window, bbi_q_threshold)
+
+
+@njit(cache=True)
+def find_peaks_simple(y: np.ndarray, distance: int, prominence: float) -> np.ndarray:
+    """scipy.signal.find_peaks 的 (distance, prominence) 专用实现。
+
+    单趟找局部极大值（平台取中点）→ 按峰高降序做 distance 筛选 →
+    prominence（不限 wlen）过滤，语义与 scipy 一致，但不构造
+    bases/width 等用不到的属性数组。返回峰值下标（升序）。
+    """
+    n = y.shape[0]
+    midpoints = np.empty(n, dtype=np.int64)
+    cnt = 0
+    i = 1
+    i_max = n - 1
+    while i < i_max:
+        if y[i - 1] < y[i]:
+            i_ahead = i + 1
+            while i_ahead < i_max and y[i_ahead] == y[i]:
+                i_ahead += 1
+            if y[i_ahead] < y[i]:
+                midpoints[cnt] = (i + i_ahead - 1) // 2
+                cnt += 1
+                i = i_ahead
+        i += 1
+    peaks = midpoints[:cnt]
+
+    # distance 筛选：按峰高降序保留，抹掉两侧距离不足的较矮峰
+    if cnt > 0 and distance > 1:
+        keep = np.ones(cnt, dtype=np.bool_)
+        heights = np.empty(cnt, dtype=np.float64)
+        for k in range(cnt):
+            heights[k] = y[peaks[k]]
+        order = np.argsort(heights)
+        for m in range(cnt - 1, -1, -1):
+            j = order[m]
+            if not keep[j]:
+                continue
+            k = j - 1
+            while k >= 0 and peaks[j] - peaks[k] < distance:
+                keep[k] = False
+                k -= 1
+            k = j + 1
+            while k < cnt and peaks[k] - peaks[j] < distance:
+                keep[k] = False
+                k += 1
+        peaks = peaks[keep]
+
+    # prominence 过滤：向两侧走到更高点为止，取两侧最小值中的较大者为基线
+    out = np.empty(peaks.shape[0], dtype=np.int64)
+    c = 0
+    for p in range(peaks.shape[0]):
+        idx = peaks[p]
+        left_min = y[idx]
+        i = idx
+        while i >= 0 and y[i] <= y[idx]:
+            if y[i] < left_min:
+                left_min = y[i]
+            i -= 1
+        right_min = y[idx]
+        i = idx
+        while i < n and y[i] <= y[idx]:
+            if y[i] < right_min:
+                right_min = y[i]
+            i += 1
+        base = left_min if left_min > right_min else right_min
+        if y[idx] - base >= prominence:
+            out[c] = idx
+            c += 1
+    return out[:c]
+
+
+@njit(cache=True)
+def _superb1_kernel(
+    close: np.ndarray,
+    J: np.ndarray,
+    dif: np.ndarray,
+    bbi: np.ndarray,
+    lookback_n: int,
+    close_vol_pct: float,
+    price_drop_pct: float,
+    j_threshold: float,
+    j_q_threshold: float,
+    b1_min_window: int,
+    b1_max_window: int,
+    b1_bbi_q: float,
+    b1_j_threshold: float,
+    b1_j_q_threshold: float,
+    b1_price_range_pct: float,
+) -> bool:
+    """SuperB1Selector 在窗口上的判定；J/DIF/BBI 为预计算指标切片。
+
+    指标均为因果量，截断到候选日 t 即该日的取值 —— 把
+    O(lookback_n · max_window) 的嵌套重算压成每个候选日 O(1)~O(w) 的判定。
+    """
+    n = close.shape[0]
+
+    # ---------- Step-1: 当日相对前一日跌幅 ----------
+    close_prev = close[n - 2]
+    if close_prev <= 0 or (close_prev - close[n - 1]) / close_prev < price_drop_pct:
+        return False
+
+    # ---------- Step-2: J 值极低 ----------
+    j_today = J[n - 1]
+    if j_today >= j_threshold:
+        if not j_today <= _quantile(J[n - lookback_n:], j_q_threshold):
+            return False
+
+    # 候选日的价格波动窗口（min_periods=1 语义与 tail(max_window) 一致）
+    rmin = rolling_min_mono(close, b1_max_window)
+    rmax = rolling_max_mono(close, b1_max_window)
+
+    # 盘整区间 [t, n-2] 的收盘价后缀极值
+    sufmax = np.empty(n, dtype=np.float64)
+    sufmin = np.empty(n, dtype=np.float64)
+    sufmax[n - 2] = close[n - 2]
+    sufmin[n - 2] = close[n - 2]
+    for t in range(n - 3, -1, -1):
+        sufmax[t] = close[t] if close[t] > sufmax[t + 1] else sufmax[t + 1]
+        sufmin[t] = close[t] if close[t] < sufmin[t + 1] else sufmin[t + 1]
+
+    # ---------- Step-3: 搜索满足 BBIKDJ 的 t_m ----------
+    for t in range(n - 1 - lookback_n, n - 1):
+        # —— BBIKDJ 前缀判定（与 evaluate_bbikdj 同序） ——
+        lo = rmin[t]
+        hi = rmax[t]
+        if lo <= 0 or (hi / lo - 1.0) > b1_price_range_pct:
+            continue
+        if dif[t] <= 0:
+            continue
+        jt = J[t]
+        if jt >= b1_j_threshold:
+            ws = t + 1 - b1_max_window if t + 1 > b1_max_window else 0
+            if jt > _quantile(J[ws : t + 1], b1_j_q_threshold):
+                continue
+        # 窗口内前 23 根为 BBI 预热期，与窗口内重算语义一致
+        if not _bbi_uptrend_arr(bbi[23 : t + 1], b1_min_window, b1_max_window, b1_bbi_q):
+            continue
+
+        # —— 匹配成功：盘整区间 [t_m, date-1] 检查 ——
+        if (n - 1) - t < 3:
+            return False  # 区间过短，与原实现的 break 分支一致
+        shi = sufmax[t]
+        slo = sufmin[t]
+        if slo <= 0 or (shi / slo - 1.0) > close_vol_pct:
+            continue
+        return True
+
+    return False
+
+
+@njit(cache=True)
+def _breakout_scan(
+    close: np.ndarray,
+    vol: np.ndarray,
+    pct_chg: np.ndarray,
+    J: np.ndarray,
+    wnd_start: int,
+    last_idx: int,
+    up_threshold: float,
+    volume_threshold: float,
+    j_floor: float,
+) -> bool:
+    """放量突破日搜索的融合内核：单趟扫描，命中即返回。
+
+    两趟反向预计算各位置之后的最大量与 J 后缀最小值，
+    正向循环内增量维护此前最高价/最大量，不产生布尔临时数组。
+    """
+    n = close.shape[0]
+
+    sfx_vol = np.empty(n, dtype=np.float64)  # max vol[i+1:]
+    mv = -np.inf
+    for i in range(n - 1, -1, -1):
+        sfx_vol[i] = mv
+        if vol[i] > mv:
+            mv = vol[i]
+
+    sfx_j = np.empty(last_idx, dtype=np.float64)  # min J[i:last_idx]
+    mj = np.inf
+    for i in range(last_idx - 1, -1, -1):
+        if J[i] < mj:
+            mj = J[i]
+        sfx_j[i] = mj
+
+    close_max = -np.inf  # max close[:t]
+    pfx_vol = -np.inf    # max vol[:t]
+    for i in range(wnd_start):
+        if close[i] > close_max:
+            close_max = close[i]
+        if vol[i] > pfx_vol:
+            pfx_vol = vol[i]
+
+    for t in range(wnd_start, last_idx):
+        # 1) 单日涨幅（NaN 不淘汰，与逐日版一致）；2) 相对放量；3) 创新高
+        if not (pct_chg[t] < up_threshold) and vol[t] > 0:
+            vol_other = pfx_vol if pfx_vol > sfx_vol[t] else sfx_vol[t]
+            if vol_other <= volume_threshold * vol[t] and close[t] > close_max:
+                # 4) T 之后 J 值维持高位
+                if sfx_j[t] > j_floor:
+                    return True
+        if close[t] > close_max:
+            close_max = close[t]
+        if vol[t] > pfx_vol:
+            pfx_vol = vol[t]
+    return False
+
+
+@njit(cache=True, parallel=True)
+def _breakout_scan_batch(
+    close: np.ndarray,
+    vol: np.ndarray,
+    pct_chg: np.ndarray,
+    J: np.ndarray,
+    dif_last: np.ndarray,
+    offsets: np.ndarray,
+    offset: int,
+    up_threshold: float,
+    volume_threshold: float,
+    j_threshold: float,
+    j_q_threshold: float,
+    price_range_pct: float,
+) -> np.ndarray:
+    """在 TickerPanel 拼接数组上逐段执行放量突破过滤，返回各股票判定。"""
+    n_tk = offsets.shape[0] - 1
+    out = np.zeros(n_tk, dtype=np.bool_)
+    for i in prange(n_tk):  # 各段相互独立，跨股票并行
+        s = offsets[i]
+        e = offsets[i + 1]
+        n = e - s
+        wnd_start = n - offset - 1
+        if wnd_start < 0:
+            wnd_start = 0
+        last_idx = n - 1
+        if last_idx <= wnd_start:
+            continue
+
+        # ---- 收盘价波动幅度约束 ----
+        hi = close[s]
+        lo = close[s]
+        for k in range(s + 1, e):
+            if close[k] > hi:
+                hi = close[k]
+            if close[k] < lo:
+                lo = close[k]
+        if lo <= 0 or (hi / lo - 1.0) > price_range_pct:
+            continue
+
+        # ---- 指定日约束：DIF > 0；J < 阈值或位于历史分位 ----
+        if dif_last[i] <= 0:
+            continue
+        j_today = J[e - 1]
+        if j_today >= j_threshold:
+            if j_today > _quantile(J[s:e], j_q_threshold):
+                continue
+
+        out[i] = _breakout_scan(
+            close[s:e],
+            vol[s:e],
+            pct_chg[s:e],
+            J[s:e],
+            wnd_start,
+            last_idx,
+            up_threshold,
+            volume_threshold,
+            j_today - 10.0,
+        )
+    return out
+
+
+# 预热：首次调用触发 JIT 编译（cache=True 时落盘，之后冷启动只剩磁盘缓存
+# 加载；缓存目录可用 NUMBA_CACHE_DIR 指定）。覆盖全部内核的入口签名，
+# 子内核（_quantile / _bbi_uptrend_arr 等）经调用链一并编译。
+_kdj_recurrence(np.array([50.0, 50.0]))
+# 行情列为 float32、指标列为 float64，两种特化都要预编译
+for _dt in (np.float64, np.float32):
+    rolling_min_mono(np.array([1.0, 0.0], dtype=_dt), 2)
+    rolling_max_mono(np.array([0.0, 1.0], dtype=_dt), 2)
+    ema_adjust_false(np.array([1.0, 1.0], dtype=_dt), 2)
+    _running_mean(np.array([1.0, 1.0], dtype=_dt), 2)
+    _bbi_arr(np.array([1.0, 1.0], dtype=_dt))
+    find_peaks_simple(np.array([0.0, 1.0, 0.0], dtype=_dt), 1, 0.0)
+# 行情 OHLC 与指标缓存均为 float32，成交量为 float64
+_f32 = np.array([1.0, 1.0], dtype=np.float32)
+_f64 = np.array([1.0, 1.0])
+evaluate_bbikdj(_f32, _f32, _f32, _f32, 0, 2, 2, 2, 0.0, 0.0, 0.0, 100.0)
+_superb1_kernel(
+    _f32, _f32, _f32, _f32,
+    1, 0.05, 0.03, -5.0, 0.10, 2, 2, 0.05, -5.0, 0.10, 100.0,
+)
+_breakout_scan(_f32, _f64, _f64, _f32, 0, 1, 3.0, 2.0 / 3, -10.0)
+_breakout_scan_batch(
+    _f32, _f64, _f64, _f32, np.array([1.0]), np.array([0, 2], dtype=np.int64),
+    1, 3.0, 2.0 / 3, 0.0, 0.10, 100.0,
+)
+del _dt, _f32, _f64
+
+
+def compute_kdj(df: pd.DataFrame, n: int = 9) -> pd.DataFrame:
+    if df.empty:
+        return df.assign(K=np.nan, D=np.nan, J=np.nan)
+
+    low_n = rolling_min_mono(df["low"].to_numpy(dtype=np.float64, copy=False), n)
+    high_n = rolling_max_mono(df["high"].to_numpy(dtype=np.float64, copy=False), n)
+    close = df["close"].to_numpy(dtype=np.float64, copy=False)
+    rsv = (close - low_n) / (high_n - low_n + 1e-9) * 100
+
+    K, D = _kdj_recurrence(rsv)
+    J = 3 * K - 2 * D
+    return df.assign(K=K, D=D, J=J)
+
+
+def compute_bbi(df: pd.DataFrame) -> pd.Series:
+    close = df["close"].to_numpy(dtype=np.float64, copy=False)
+    bbi = (
+        _running_mean(close, 3)
+        + _running_mean(close, 6)
+        + _running_mean(close, 12)
+        + _running_mean(close, 24)
+    ) / 4
+    return pd.Series(bbi, index=df.index)
+
+
+def compute_rsv(
+    df: pd.DataFrame,
+    n: int,
+) -> pd.Series:
+    """
+    按公式：RSV(N) = 100 × (C - LLV(L,N)) ÷ (HHV(C,N) - LLV(L,N))
+    - C 用收盘价最高值 (HHV of close)
+    - L 用最低价最低值 (LLV of low)
+    """
+    close = df["close"].to_numpy(dtype=np.float64, copy=False)
+    low_n = rolling_min_mono(df["low"].to_numpy(dtype=np.float64, copy=False), n)
+    high_close_n = rolling_max_mono(close, n)
+    rsv = (close - low_n) / (high_close_n - low_n + 1e-9) * 100.0
+    return pd.Series(rsv, index=df.index)
+
+
+def compute_dif(df: pd.DataFrame, fast: int = 12, slow: int = 26) -> pd.Series:
+    """计算 MACD 指标中的 DIF (EMA fast - EMA slow)。"""
+    close = df["close"].to_numpy(dtype=np.float64, copy=False)
+    dif = ema_adjust_false(close, fast) - ema_adjust_false(close, slow)
+    return pd.Series(dif, index=df.index)
+
+
+def bbi_deriv_uptrend(
+    bbi: pd.Series,
+    *,
+    min_window: int,
+    max_window: int | None = None,
+    q_threshold: float = 0.0,
+) -> bool:
+    """
+    判断 BBI 是否“整体上升”。
+
+    令最新交易日为 T，在区间 [T-w+1, T]（w 自适应，w ≥ min_window 且 ≤ max_window）
+    内，先将 BBI 归一化：BBI_norm(t) = BBI(t) / BBI(T-w+1)。
+
+    再计算一阶差分 Δ(t) = BBI_norm(t) - BBI_norm(t-1)。  
+    若 Δ(t) 的前 q_threshold 分位数 ≥ 0，则认为该窗口通过；只要存在
+    **最长** 满足条件的窗口即可返回 True。q_threshold=0 时退化为
+    “全程单调不降”（旧版行为）。
+
+    Parameters
+    ----------
+    bbi : pd.Series
+        BBI 序列（最新值在最后一位）。
+    min_window : int
+        检测窗口的最小长度。
+    max_window : int | None
+        检测窗口的最大长度；None 表示不设上限。
+    q_threshold : float, default 0.0
+        允许一阶差分为负的比例（0 ≤ q_threshold ≤ 1）。
+    """
+    if not 0.0 <= q_threshold <= 1.0:
+        raise ValueError("q_threshold 必须位于 [0, 1] 区间内")
+
+    return bool(
+        _bbi_uptrend_arr(
+            bbi.to_numpy(dtype=np.float64, copy=False),
+            min_window,
+            max_window or 0,
+            q_threshold,
+        )
+    )
+
+
+def _find_peaks(
+    df: pd.DataFrame,
+    *,
+    column: str = "high",
+    distance: int = 1,
+    prominence: float = 0.0,
+    as_frame: bool = True,
+) -> Union[pd.DataFrame, np.ndarray]:
+    """提取峰值。``as_frame=False`` 时仅返回峰值整数下标，
+    不构造 DataFrame —— 调用方按位置索引原始数组即可。"""
+    if column not in df.columns:
+        raise KeyError(f"'{column}' not found in DataFrame columns: {list(df.columns)}")
+
+    y = df[column].to_numpy(dtype=np.float64, copy=False)
+    indices = find_peaks_simple(y, distance, prominence)
+    if not as_frame:
+        return indices
+
+    peaks_df = df.iloc[indices].copy()
+    peaks_df["is_peak"] = True
+    return peaks_df
+
+
+# --------------------------- Selector 类 --------------------------- #
+class BBIKDJSelector:
+    """
+    自适应 *BBI(导数)* + *KDJ* 选股器
+        • BBI: 允许 bbi_q_threshold 比例的回撤
+        • KDJ: J < threshold ；或位于历史 J 的 j_q_threshold 分位及以下
+        • MACD: DIF > 0
+        • 收盘价波动幅度 ≤ price_range_pct
+    """
+
+    def __init__(
+        self,
+        j_threshold: float = -5,
+        bbi_min_window: int = 90,
+        max_window: int = 90,
+        price_range_pct: float = 100.0,
+        bbi_q_threshold: float = 0.05,
+        j_q_threshold: float = 0.10,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.j_threshold = j_threshold
+        self.bbi_min_window = bbi_min_window
+        self.max_window = max_window
+        self.price_range_pct = price_range_pct
+        self.bbi_q_threshold = bbi_q_threshold  # ← 原 q_threshold
+        self.j_q_threshold = j_q_threshold      # ← 新增
+        self.max_workers = max_workers          # 并行评估线程数；None 取 CPU 核数
+
+    # ---------- 单支股票过滤 ---------- #
+    def _passes_filters(self, arrs: StockArrays, start: int, end: int) -> bool:
+        # 数据量不足（BBI 预热 23 根 + 最短检测窗口）时直接拒绝，免去指标计算
+        if end - start < self.bbi_min_window + 23:
+            return False
+
+        ind = get_indicators(arrs)
+        return bool(
+            evaluate_bbikdj(
+                arrs.close,
+                ind.J,
+                ind.dif,
+                ind.bbi,
+                start,
+                end,
+                self.bbi_min_window,
+                self.max_window,
+                self.bbi_q_threshold,
+                self.j_threshold,
+                self.j_q_threshold,
+                self.price_range_pct,
+            )
+        )
+
+    # ---------- 多股票批量 ---------- #
+    def select(
+        self, date: pd.Timestamp, data: Dict[str, StockData]
+    ) -> List[str]:
+        ts = np.datetime64(pd.Timestamp(date))
+
+        def _check(obj: StockData) -> bool:
+            arrs = to_arrays(obj)
+            # date 升序，二分定位截止位置，免去整列布尔掩码
+            end = int(np.searchsorted(arrs.date, ts, side="right"))
+            if end == 0:
+                return False
+            # 额外预留 20 根 K 线缓冲
+            start = max(0, end - (self.max_window + 20))
+            return self._passes_filters(arrs, start, end)
+
+        return _select_parallel(data, _check, self.max_workers)
+    
+    
+class SuperB1Selector:
+    """SuperB1 选股器
+
+    过滤逻辑概览
+    ----------------
+    1. **历史匹配 (t_m)** — 在 *lookback_n* 个交易日窗口内，至少存在一日
+       满足 :class:`BBIKDJSelector`。
+
+    2. **盘整区间** — 区间 ``[t_m, date-1]`` 收盘价波动率不超过 ``close_vol_pct``。
+
+    3. **当日下跌** — ``(close_{date-1} - close_date) / close_{date-1}``
+       ≥ ``price_drop_pct``。
+
+    4. **J 值极低** — ``J < j_threshold`` *或* 位于历史 ``j_q_threshold`` 分位。
+    """
+
+    # ---------------------------------------------------------------------
+    # 构造函数
+    # ---------------------------------------------------------------------
+    def __init__(
+        self,
+        *,
+        lookback_n: int = 60,
+        close_vol_pct: float = 0.05,
+        price_drop_pct: float = 0.03,
+        j_threshold: float = -5,
+        j_q_threshold: float = 0.10,
+        # ↓↓↓ 新增：嵌套 BBIKDJSelector 配置
+        B1_params: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:        
+        # ---------- 参数合法性检查 ----------
+        if lookback_n < 2:
+            raise ValueError("lookback_n 应 ≥ 2")
+        if not (0 < close_vol_pct < 1):
+            raise ValueError("close_vol_pct 应位于 (0, 1) 区间")
+        if not (0 < price_drop_pct < 1):
+            raise ValueError("price_drop_pct 应位于 (0, 1) 区间")
+        if not (0 <= j_q_threshold <= 1):
+            raise ValueError("j_q_threshold 应位于 [0, 1] 区间")
+        if B1_params is None:
+            raise ValueError("bbi_params没有给出")
+
+        # ---------- 基本参数 ----------
+        self.lookback_n = lookback_n
+        self.close_vol_pct = close_vol_pct
+        self.price_drop_pct = price_drop_pct
+        self.j_threshold = j_threshold
+        self.j_q_threshold = j_q_threshold
+        self.max_workers = max_workers
+
+        # ---------- 内部 BBIKDJSelector ----------
+        self.bbi_selector = BBIKDJSelector(**(B1_params or {}))
+
+        # 为保证给 BBIKDJSelector 提供足够历史，预留额外缓冲
+        self._extra_for_bbi = self.bbi_selector.max_window + 20
+
+    # 单支股票过滤核心
+    def _passes_filters(self, arrs: StockArrays, start: int, end: int) -> bool:
+        """窗口 [start, end) 必须按日期升序，且末行为目标 *date*。"""
+        if end - start < 2:
+            return False
+
+        # ---------- Step-0: 数据量判断 ----------
+        if end - start < self.lookback_n + self._extra_for_bbi:
+            return False
+
+        ind = get_indicators(arrs)
+        b1 = self.bbi_selector
+        return bool(
+            _superb1_kernel(
+                arrs.close[start:end],
+                ind.J[start:end],
+                ind.dif[start:end],
+                ind.bbi[start:end],
+                self.lookback_n,
+                self.close_vol_pct,
+                self.price_drop_pct,
+                self.j_threshold,
+                self.j_q_threshold,
+                b1.bbi_min_window,
+                b1.max_window,
+                b1.bbi_q_threshold,
+                b1.j_threshold,
+                b1.j_q_threshold,
+                b1.price_range_pct,
+            )
+        )
+
+    # 批量选股接口
+    def select(self, date: pd.Timestamp, data: Dict[str, StockData]) -> List[str]:
+        min_len = self.lookback_n + self._extra_for_bbi
+        ts = np.datetime64(pd.Timestamp(date))
+
+        def _check(obj: StockData) -> bool:
+            arrs = to_arrays(obj)
+            end = int(np.searchsorted(arrs.date, ts, side="right"))
+            if end < min_len:
+                return False
+            return self._passes_filters(arrs, end - min_len, end)
+
+        return _select_parallel(data, _check, self.max_workers)
+
+
+class PeakKDJSelector:
+    """
+    Peaks + KDJ 选股器    
+    """
+
+    def __init__(
+        self,
+        j_threshold: float = -5,
+        max_window: int = 90,
+        fluc_threshold: float = 0.03,
+        gap_threshold: float = 0.02,
+        j_q_threshold: float = 0.10,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.j_threshold = j_threshold
+        self.max_window = max_window
+        self.fluc_threshold = fluc_threshold  # 当日↔peak_(t-n) 波动率上限
+        self.gap_threshold = gap_threshold    # oc_prev 必须高于区间最低收盘价的比例
+        self.j_q_threshold = j_q_threshold
+        self.max_workers = max_workers
+
+    # ---------- 单支股票过滤 ---------- #
+    def _passes_filters(self, arrs: StockArrays, start: int, end: int) -> bool:
+        n = end - start
+        # 两个峰至少相隔 6 根，再加上不计入峰的当日
+        if n < 8:
+            return False
+
+        dates = arrs.date[start:end]
+        close = arrs.close[start:end]
+        oc_max = np.maximum(arrs.open[start:end], close)
+
+        # 1. 提取 peaks
+        peaks = find_peaks_simple(oc_max, 6, 0.5)
+
+        # 至少两个峰（不含当日）
+        peaks = peaks[dates[peaks] < dates[n - 1]]
+        total_peaks = peaks.shape[0]
+        if total_peaks < 2:
+            return False
+
+        pt = peaks[total_peaks - 1]         # 最新一个峰
+        oc_t = oc_max[pt]
+
+        # 2. 回溯寻找 peak_(t-n)
+        target = -1
+        for idx in range(total_peaks - 2, -1, -1):
+            pp = peaks[idx]
+            oc_prev = oc_max[pp]
+            if oc_t <= oc_prev:             # 要求 peak_t > peak_(t-n)
+                continue
+
+            # 只有当“总峰数 ≥ 3”时才检查区间内其他峰 oc_max
+            if total_peaks >= 3 and idx < total_peaks - 2:
+                inter_oc = oc_max[peaks[idx + 1 : total_peaks - 1]]
+                if not (inter_oc < oc_prev).all():
+                    continue
+
+            # 新增： oc_prev 高于区间最低收盘价 gap_threshold
+            seg = close[pp + 1 : pt]
+            if seg.size == 0:
+                continue                    # 区间无数据
+            if oc_prev <= seg.min() * (1 + self.gap_threshold):
+                continue
+
+            target = pp
+
+            break
+
+        if target < 0:
+            return False
+
+        # 3. 当日收盘价波动率
+        fluc_pct = abs(close[n - 1] - close[target]) / close[target]
+        if fluc_pct > self.fluc_threshold:
+            return False
+
+        # 4. KDJ 过滤（J 为预计算指标切片）
+        J = get_indicators(arrs).J[start:end]
+        j_today = float(J[n - 1])
+        if j_today >= self.j_threshold:
+            if j_today > float(_quantile(J[-self.max_window:], self.j_q_threshold)):
+                return False
+
+        return True
+
+    # ---------- 多股票批量 ---------- #
+    def select(
+        self,
+        date: pd.Timestamp,
+        data: Dict[str, StockData],
+    ) -> List[str]:
+        ts = np.datetime64(pd.Timestamp(date))
+
+        def _check(obj: StockData) -> bool:
+            arrs = to_arrays(obj)
+            end = int(np.searchsorted(arrs.date, ts, side="right"))
+            if end == 0:
+                return False
+            start = max(0, end - (self.max_window + 20))  # 额外缓冲
+            return self._passes_filters(arrs, start, end)
+
+        return _select_parallel(data, _check, self.max_workers)
+
+
+class BBIShortLongSelector:
+    """
+    BBI 上升 + 短/长期 RSV 条件 + DIF > 0 选股器
+    """
+    def __init__(
+        self,
+        n_short: int = 3,
+        n_long: int = 21,
+        m: int = 3,
+        bbi_min_window: int = 90,
+        max_window: int = 150,
+        bbi_q_threshold: float = 0.05,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if m < 2:
+            raise ValueError("m 必须 ≥ 2")
+        self.n_short = n_short
+        self.n_long = n_long
+        self.m = m
+        self.bbi_min_window = bbi_min_window
+        self.max_window = max_window
+        self.bbi_q_threshold = bbi_q_threshold   # 新增参数
+        self.max_workers = max_workers
+
+    # ---------- 单支股票过滤 ---------- #
+    def _passes_filters(self, arrs: StockArrays, start: int, end: int) -> bool:
+        # 数据量不足时直接拒绝
+        if end - start < max(self.bbi_min_window + 23, self.m):
+            return False
+
+        ind = get_indicators(arrs)
+
+        # 1. BBI 上升（窗口内前 23 根为 BBI 预热期，与窗口内重算语义一致）
+        ws = min(start + 23, end)
+        if not _bbi_uptrend_arr(
+            ind.bbi[ws:end],
+            self.bbi_min_window,
+            self.max_window,
+            self.bbi_q_threshold,
+        ):
+            return False
+
+        # 2. 短/长期 RSV -----------------
+        if end - start < self.m:
+            return False                        # 数据不足
+
+        rsv_short = ind.rsv(self.n_short)[end - self.m : end]   # 最近 m 天
+        rsv_long = ind.rsv(self.n_long)[end - self.m : end]
+
+        long_ok = (rsv_long >= 80).all()        # 长期 RSV 全 ≥ 80
+        short_start_end_ok = rsv_short[0] >= 80 and rsv_short[-1] >= 80
+        short_has_below_20 = (rsv_short < 20).any()
+
+        if not (long_ok and short_start_end_ok and short_has_below_20):
+            return False
+
+        # 3. MACD：DIF > 0 -------------------
+        return ind.dif[end - 1] > 0
+
+    # ---------- 多股票批量 ---------- #
+    def select(
+        self,
+        date: pd.Timestamp,
+        data: Dict[str, StockData],
+    ) -> List[str]:
+        ts = np.datetime64(pd.Timestamp(date))
+        # 预留足够长度：RSV 计算窗口 + BBI 检测窗口 + m
+        need_len = (
+            max(self.n_short, self.n_long)
+            + self.bbi_min_window
+            + self.m
+        )
+        need_len = max(need_len, self.max_window)
+
+        def _check(obj: StockData) -> bool:
+            arrs = to_arrays(obj)
+            end = int(np.searchsorted(arrs.date, ts, side="right"))
+            if end == 0:
+                return False
+            start = max(0, end - need_len)
+            return self._passes_filters(arrs, start, end)
+
+        return _select_parallel(data, _check, self.max_workers)
+
+
+class BreakoutVolumeKDJSelector:
+    """
+    放量突破 + KDJ + DIF>0 + 收盘价波动幅度 选股器   
+    """
+
+    def __init__(
+        self,
+        j_threshold: float = 0.0,
+        up_threshold: float = 3.0,
+        volume_threshold: float = 2.0 / 3,
+        offset: int = 15,
+        max_window: int = 120,
+        price_range_pct: float = 10.0,
+        j_q_threshold: float = 0.10,        # ← 新增
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.j_threshold = j_threshold
+        self.up_threshold = up_threshold
+        self.volume_threshold = volume_threshold
+        self.offset = offset
+        self.max_window = max_window
+        self.price_range_pct = price_range_pct
+        self.j_q_threshold = j_q_threshold  # ← 新增
+        self.max_workers = max_workers
+
+    # ---------- 单支股票过滤 ---------- #
+    def _passes_filters(self, arrs: StockArrays, end: int) -> bool:
+        if end < self.offset + 2:
+            return False
+
+        start = max(0, end - self.max_window)
+        close = arrs.close[start:end]
+        vol = arrs.volume[start:end]
+        n = end - start
+
+        # ---- 收盘价波动幅度约束 ----
+        high, low = close.max(), close.min()
+        if low <= 0 or (high / low - 1) > self.price_range_pct:
+            return False
+
+        # ---- 放量突破候选日（仅用涨幅/量/新高三个便宜条件） ----
+        pct_chg = np.empty(n, dtype=np.float64)
+        pct_chg[0] = np.nan
+        pct_chg[1:] = (close[1:] / close[:-1] - 1.0) * 100.0
+
+        wnd_start = max(0, n - self.offset - 1)
+        last_idx = n - 1
+        if last_idx <= wnd_start:
+            return False
+
+        # 0) 指定日约束：J < j_threshold 或位于历史分位；且 DIF > 0
+        #    （O(1)/O(w) 且淘汰率高，放在突破日搜索之前）
+        ind = get_indicators(arrs)
+        if ind.dif[end - 1] <= 0:
+            return False
+
+        # J 分位数窗口无缓冲，须按窗口重算（见 _window_kdj_j）
+        J = _window_kdj_j(arrs, start, end)
+        j_today = float(J[n - 1])
+        # 分位数仅在阈值条件未命中时才计算
+        if j_today >= self.j_threshold:
+            if j_today > float(_quantile(J, self.j_q_threshold)):
+                return False
+
+        # 1)~4) 融合内核单趟搜索突破日
+        return bool(
+            _breakout_scan(
+                close,
+                vol,
+                pct_chg,
+                J,
+                wnd_start,
+                last_idx,
+                self.up_threshold,
+                self.volume_threshold,
+                j_today - 10,
+            )
+        )
+
+    # ---------- 多股票批量 ---------- #
+    def select(
+        self, date: pd.Timestamp, data: Dict[str, StockData]
+    ) -> List[str]:
+        ts = np.datetime64(pd.Timestamp(date))
+        panel = build_ticker_panel(
+            data, ts, self.max_window, self.offset + 2, self.max_workers
+        )
+        if not panel.codes:
+            return []
+        mask = _breakout_scan_batch(
+            panel.close,
+            panel.volume,
+            panel.pct_chg,
+            panel.J,
+            panel.dif_last,
+            panel.offsets,
+            self.offset,
+            self.up_threshold,
+            self.volume_threshold,
+            self.j_threshold,
+            self.j_q_threshold,
+            self.price_range_pct,
+        )
+        return [code for code, ok in zip(panel.codes, mask) if ok]
@@ -0,0 +1,18 @@
+"""numba 可选加速依赖的统一入口。
+
+缺失 numba 时 ``njit`` 退化为恒等装饰器、``prange`` 退化为 ``range``，
+纯 Python/NumPy 路径结果一致，只是不再加速。
+"""
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+    prange = range
@@ -10,6 +10,8 @@ from typing import Any, Dict, Iterable, List
 
 import pandas as pd
 
+from Selector import to_arrays
+
 # ---------- 日志 ----------
 logging.basicConfig(
     level=logging.INFO,
@@ -25,6 +27,22 @@ logger = logging.getLogger("select")
 
 # ---------- 工具 ----------
 
+# pyarrow 的 CSV 解析多线程且按列定型；缺失时退回 pandas 默认引擎
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE: Dict[str, Any] = {"engine": "pyarrow"}
+except ImportError:
+    _CSV_ENGINE = {}
+
+# OHLC 直接读成 float32，与 Selector 的列式缓存一致，省一次转换
+_CSV_DTYPES = {
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+}
+
+
 def load_data(data_dir: Path, codes: Iterable[str]) -> Dict[str, pd.DataFrame]:
     frames: Dict[str, pd.DataFrame] = {}
     for code in codes:
@@ -32,7 +50,11 @@ def load_data(data_dir: Path, codes: Iterable[str]) -> Dict[str, pd.DataFrame]:
         if not fp.exists():
             logger.warning("%s 不存在，跳过", fp.name)
             continue
-        df = pd.read_csv(fp, parse_dates=["date"]).sort_values("date")
+        df = pd.read_csv(
+            fp, parse_dates=["date"], dtype=_CSV_DTYPES, **_CSV_ENGINE
+        ).sort_values("date")
+        # 预提取列式缓存：date 已升序，Selector.select 里直接二分定位
+        to_arrays(df)
         frames[code] = df
     return frames
 